@@ -1,10 +1,42 @@
+from __future__ import annotations
+
+import base64
+import binascii
 import json
 import os
+import time
+import hashlib
+import hmac
+import ipaddress
 import logging
-from typing import Dict, Any, Optional
-import boto3
+from typing import TYPE_CHECKING, Dict, Any, Optional
 from botocore.exceptions import ClientError
-import openai
+
+# asyncio, boto3, botocore.config and openai are imported on first use so OPTIONS-only cold starts skip them
+if TYPE_CHECKING:
+    import asyncio
+    import httpx
+    import openai
+
+# orjson is much faster for large responses; fall back to the stdlib if the layer lacks it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+__all__ = [
+    'lambda_handler',
+    'create_response',
+    'get_openai_api_key',
+    'validate_request',
+    'validate_ip_whitelist',
+    'validate_api_key',
+    'handle_options_request',
+    'handle_get_request',
+    'handle_post_request',
+    'handle_batch_queries',
+    'handle_streaming_response',
+]
 
 # Configure logging
 logger = logging.getLogger()
@@ -12,50 +44,218 @@ logger.setLevel(logging.INFO)
 
 # Add a comment to force redeployment
 
-# Initialize AWS clients
-secrets_manager = boto3.client('secretsmanager', region_name='us-east-1')
+def _json_loads(data: str | bytes) -> Any:
+    """
+    Parse JSON with orjson when available (its JSONDecodeError subclasses the stdlib one)
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(data: Any) -> str:
+    """
+    Serialize JSON with orjson when available, stringifying unsupported types
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, default=str)
+
+# AWS clients, created lazily and reused across warm invocations
+_secrets_manager = None
+
+def _get_secrets_manager():
+    """
+    Return the shared Secrets Manager client, creating it on first use
+    """
+    global _secrets_manager
+    
+    if _secrets_manager is None:
+        import boto3
+        from botocore.config import Config
+        _secrets_manager = boto3.client(
+            'secretsmanager',
+            region_name='us-east-1',
+            config=Config(
+                max_pool_connections=50,
+                tcp_keepalive=True,
+                retries={'mode': 'adaptive', 'max_attempts': 3},
+                connect_timeout=2,
+                read_timeout=5
+            )
+        )
+    return _secrets_manager
+
+def _env_int(name: str, default: int) -> int:
+    """
+    Read an integer setting from the environment, falling back to the default on bad values
+    """
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning("Invalid integer for %s: %r, using default %s", name, raw, default)
+        return default
+
+# Secret names are fixed for the container lifetime
+OPENAI_SECRET_NAME = os.environ.get('OPENAI_SECRET_NAME', 'travel-gpt/openai-api-key')
+API_KEY_SECRET_NAME = os.environ.get('API_KEY_SECRET_NAME', 'travel-gpt/api-key')
+
+# Secrets cached across warm invocations: secret name -> (fetched_at, api_key)
+SECRET_CACHE_TTL = _env_int('SECRET_CACHE_TTL', 300)
+_secret_cache: dict[str, tuple[float, str]] = {}
+
+# Recently validated client API keys: blake2b digest of key -> expiry timestamp
+API_KEY_VALIDATION_TTL = _env_int('API_KEY_VALIDATION_TTL', 60)
+_api_key_validations: dict[str, float] = {}
+
+# Upper bound on queries answered concurrently in one batch POST
+MAX_BATCH_QUERIES = _env_int('MAX_BATCH_QUERIES', 5)
+
+def _cached_secret(secret_name: str, ttl: int = SECRET_CACHE_TTL) -> Optional[str]:
+    """
+    Return the api_key stored in a secret, fetching from Secrets Manager only when the cached value has expired
+    """
+    cached = _secret_cache.get(secret_name)
+    if cached and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+    
+    response = _get_secrets_manager().get_secret_value(SecretId=secret_name)
+    api_key = _json_loads(response['SecretString']).get('api_key')
+    
+    # Only cache successful lookups so a missing key is retried on the next request
+    if api_key:
+        _secret_cache[secret_name] = (time.monotonic(), api_key)
+    return api_key
 
 def get_openai_api_key() -> Optional[str]:
     """
     Retrieve OpenAI API key from AWS Secrets Manager
     """
     try:
-        secret_name = os.environ.get('OPENAI_SECRET_NAME', 'travel-gpt/openai-api-key')
-        response = secrets_manager.get_secret_value(SecretId=secret_name)
-        secret = json.loads(response['SecretString'])
-        return secret.get('api_key')
+        return _cached_secret(OPENAI_SECRET_NAME)
     except ClientError as e:
-        logger.error(f"Error retrieving secret: {e}")
+        logger.error("Error retrieving secret: %s", e)
         return None
     except Exception as e:
-        logger.error(f"Unexpected error: {e}")
+        logger.error("Unexpected error: %s", e)
         return None
 
-def create_response(status_code: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+# Event loop kept for the container lifetime; asyncio.run() would close it after each
+# invocation and strand the pooled connections of the async OpenAI client
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _get_event_loop() -> asyncio.AbstractEventLoop:
     """
-    Create a standardized API Gateway response
+    Return the shared event loop, creating it on first use
     """
-    # Get the origin from the request to handle CORS dynamically
-    origin = 'https://travelgpt.nakshatra-ai.com'  # Default to your domain
+    global _event_loop
     
-    default_headers = {
-        'Content-Type': 'application/json',
-        'Access-Control-Allow-Origin': origin,
-        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token,X-API-Key',
-        'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS',
-        'Access-Control-Allow-Credentials': 'true',
-        'Access-Control-Max-Age': '86400'  # Cache preflight for 24 hours
-    }
+    if _event_loop is None:
+        import asyncio
+        _event_loop = asyncio.new_event_loop()
+    return _event_loop
+
+# OpenAI client reused across warm invocations. Its httpx connection pool lives for the
+# whole container; a key rotation only rebuilds the AsyncOpenAI wrapper around it
+_openai_http_client: Optional[httpx.AsyncClient] = None
+_openai_client: Optional[openai.AsyncOpenAI] = None
+
+def _get_openai_client() -> Optional[openai.AsyncOpenAI]:
+    """
+    Return the shared OpenAI client, creating it on first use or when the API key has rotated
+    """
+    global _openai_http_client, _openai_client
     
-    if headers:
-        default_headers.update(headers)
+    api_key = get_openai_api_key()
+    if not api_key:
+        return None
     
+    if _openai_client is None or _openai_client.api_key != api_key:
+        import httpx
+        import openai
+        if _openai_http_client is None:
+            _openai_http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+                # Long gpt-4o generations need most of the 120s Lambda timeout
+                timeout=httpx.Timeout(100.0, connect=5.0)
+            )
+        _openai_client = openai.AsyncOpenAI(api_key=api_key, http_client=_openai_http_client)
+    return _openai_client
+
+# Travel-focused system prompt shared by every completion; never mutate
+_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": """You are a knowledgeable travel assistant specializing in providing detailed, helpful, and accurate travel advice.
+
+When responding to travel queries:
+- Provide specific, actionable recommendations
+- Include practical details like best times to visit, costs, and tips
+- Suggest local experiences and hidden gems
+- Consider safety and accessibility
+- Be enthusiastic but realistic about expectations
+- Format your response in a clear, easy-to-read structure
+
+Always be helpful, informative, and engaging in your travel advice."""
+}
+
+# Headers shared by every response; never mutate, merge into a copy instead
+_DEFAULT_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': 'https://travelgpt.nakshatra-ai.com',
+    'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token,X-API-Key',
+    'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS',
+    'Access-Control-Allow-Credentials': 'true',
+    'Access-Control-Max-Age': '86400'  # Cache preflight for 24 hours
+}
+
+def _parse_body(event: Dict[str, Any]) -> Any:
+    """
+    Parse the JSON request body, decoding base64 payloads from binary-mode API Gateway
+    """
+    raw = event.get('body')
+    if not raw:
+        return {}
+    if event.get('isBase64Encoded'):
+        raw = base64.b64decode(raw, validate=True)
+    return _json_loads(raw)
+
+def create_response(status_code: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Create a standardized API Gateway response
+    """
     return {
         'statusCode': status_code,
-        'headers': default_headers,
-        'body': json.dumps(body, default=str)
+        'headers': {**_DEFAULT_HEADERS, **headers} if headers else _DEFAULT_HEADERS,
+        'body': _json_dumps(body)
     }
 
+def _parse_ip_whitelist(raw: str) -> tuple[frozenset[str], tuple[ipaddress.IPv4Network | ipaddress.IPv6Network, ...]]:
+    """
+    Split the comma-separated whitelist into exact addresses and CIDR networks
+    """
+    addresses = set()
+    networks = []
+    for entry in raw.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        if '/' not in entry:
+            addresses.add(entry)
+            continue
+        try:
+            networks.append(ipaddress.ip_network(entry, strict=False))
+        except ValueError:
+            # Keep the entry as a never-matching address so a broken whitelist still counts
+            # as configured and denies everyone, rather than falling back to allow-all
+            logger.error("Invalid whitelist network will never match: %s", entry)
+            addresses.add(entry)
+    return frozenset(addresses), tuple(networks)
+
+# Whitelist is fixed configuration, so parse it once per container
+_WHITELISTED_IPS, _WHITELISTED_NETWORKS = _parse_ip_whitelist(os.environ.get('WHITELISTED_IPS', ''))
+
 def validate_ip_whitelist(event: Dict[str, Any]) -> tuple[bool, str]:
     """
     Validate IP address against whitelist (optional)
@@ -64,23 +264,27 @@ def validate_ip_whitelist(event: Dict[str, Any]) -> tuple[bool, str]:
         # Get client IP
         client_ip = event.get('requestContext', {}).get('identity', {}).get('sourceIp', '')
         
-        # Get whitelisted IPs from environment variable (comma-separated)
-        whitelisted_ips = os.environ.get('WHITELISTED_IPS', '').split(',')
-        whitelisted_ips = [ip.strip() for ip in whitelisted_ips if ip.strip()]
-        
         # If no whitelist is configured, allow all IPs
-        if not whitelisted_ips:
+        if not _WHITELISTED_IPS and not _WHITELISTED_NETWORKS:
             return True, ""
         
         # Check if client IP is in whitelist
-        if client_ip in whitelisted_ips:
+        if client_ip in _WHITELISTED_IPS:
             return True, ""
         
-        logger.warning(f"IP not in whitelist: {client_ip}")
+        if _WHITELISTED_NETWORKS and client_ip:
+            try:
+                address = ipaddress.ip_address(client_ip)
+            except ValueError:
+                address = None
+            if address is not None and any(address in network for network in _WHITELISTED_NETWORKS):
+                return True, ""
+        
+        logger.warning("IP not in whitelist: %s", client_ip)
         return False, "IP address not authorized"
         
     except Exception as e:
-        logger.error(f"Error validating IP: {e}")
+        logger.error("Error validating IP: %s", e)
         return False, "IP validation failed"
 
 def validate_api_key(event: Dict[str, Any]) -> tuple[bool, str]:
@@ -88,31 +292,36 @@ def validate_api_key(event: Dict[str, Any]) -> tuple[bool, str]:
     Validate API key from request headers
     """
     try:
-        # Get API key from headers
-        headers = event.get('headers', {})
-        api_key = headers.get('X-API-Key') or headers.get('x-api-key')
+        # Get API key from headers; API Gateway REST events preserve the client's header casing
+        headers = event.get('headers') or {}
+        api_key = next((value for name, value in headers.items() if name.lower() == 'x-api-key'), None)
         
         if not api_key:
             return False, "API key is required"
         
+        # Skip the lookup entirely if this key was validated recently
+        key_hash = hashlib.blake2b(api_key.encode(), digest_size=16).hexdigest()
+        expires_at = _api_key_validations.get(key_hash)
+        if expires_at and time.monotonic() < expires_at:
+            return True, ""
+        
         # Get stored API key from Secrets Manager
-        secret_name = os.environ.get('API_KEY_SECRET_NAME', 'travel-gpt/api-key')
-        response = secrets_manager.get_secret_value(SecretId=secret_name)
-        stored_api_key = json.loads(response['SecretString']).get('api_key')
+        stored_api_key = _cached_secret(API_KEY_SECRET_NAME)
         
         if not stored_api_key:
             logger.error("Stored API key not found")
             return False, "API key validation failed"
         
-        # Compare API keys
-        if api_key != stored_api_key:
-            logger.warning(f"Invalid API key attempt from IP: {event.get('requestContext', {}).get('identity', {}).get('sourceIp', 'unknown')}")
+        # Compare API keys in constant time
+        if not hmac.compare_digest(api_key.encode(), stored_api_key.encode()):
+            logger.warning("Invalid API key attempt from IP: %s", event.get('requestContext', {}).get('identity', {}).get('sourceIp', 'unknown'))
             return False, "Invalid API key"
         
+        _api_key_validations[key_hash] = time.monotonic() + API_KEY_VALIDATION_TTL
         return True, ""
         
     except Exception as e:
-        logger.error(f"Error validating API key: {e}")
+        logger.error("Error validating API key: %s", e)
         return False, "API key validation failed"
 
 def validate_request(event: Dict[str, Any]) -> tuple[bool, str]:
@@ -167,114 +376,159 @@ def handle_get_request(event: Dict[str, Any]) -> Dict[str, Any]:
             "has_api_key": False
         })
 
-def handle_streaming_response(client: openai.OpenAI, messages: list, max_tokens: int = 4000) -> tuple[str, dict, bool]:
+async def handle_streaming_response(client: openai.AsyncOpenAI, messages: list, max_tokens: int = 8000) -> tuple[str, dict, bool]:
     """
-    Handle streaming responses to prevent truncation for very long responses
+    Stream a single completion at the full token limit to prevent truncation for very long responses.
+    Errors propagate to the caller, which logs them once.
     """
-    try:
-        # First try with standard completion
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            max_tokens=max_tokens,
-            temperature=0.7,
-            top_p=1,
-            frequency_penalty=0,
-            presence_penalty=0,
-            response_format={"type": "text"}
-        )
-        
-        ai_response = response.choices[0].message.content
-        finish_reason = response.choices[0].finish_reason
-        is_truncated = finish_reason == "length"
-        
-        # If truncated, try with streaming to get the full response
-        if is_truncated:
-            logger.info("Response truncated, attempting streaming completion...")
-            
-            # Use streaming to get the complete response
-            stream_response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=messages,
-                max_tokens=8000,  # Higher limit for streaming
-                temperature=0.7,
-                top_p=1,
-                frequency_penalty=0,
-                presence_penalty=0,
-                stream=True
-            )
-            
-            # Collect the full response from stream
-            full_response = ""
-            for chunk in stream_response:
-                if chunk.choices[0].delta.content is not None:
-                    full_response += chunk.choices[0].delta.content
-            
-            ai_response = full_response
-            is_truncated = False
-            finish_reason = "stop"
-        
-        return ai_response, {
-            "prompt_tokens": response.usage.prompt_tokens if not is_truncated else 0,
-            "completion_tokens": response.usage.completion_tokens if not is_truncated else 0,
-            "total_tokens": response.usage.total_tokens if not is_truncated else 0
-        }, is_truncated
+    stream_response = await client.chat.completions.create(
+        model="gpt-4o",
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=0.7,
+        top_p=1,
+        frequency_penalty=0,
+        presence_penalty=0,
+        response_format={"type": "text"},
+        stream=True,
+        stream_options={"include_usage": True}
+    )
+    
+    # Collect the full response from stream; the final chunk carries usage and no choices
+    parts: list[str] = []
+    finish_reason = None
+    usage = None
+    async for chunk in stream_response:
+        if chunk.usage is not None:
+            usage = chunk.usage
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        content = choice.delta.content
+        if content is not None:
+            parts.append(content)
+        if choice.finish_reason is not None:
+            finish_reason = choice.finish_reason
+    
+    return "".join(parts), {
+        "prompt_tokens": usage.prompt_tokens if usage else 0,
+        "completion_tokens": usage.completion_tokens if usage else 0,
+        "total_tokens": usage.total_tokens if usage else 0
+    }, finish_reason == "length"
+
+async def handle_batch_queries(client: openai.AsyncOpenAI, queries: list[str], event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Answer several travel queries concurrently within a single invocation
+    """
+    tasks = [
+        handle_streaming_response(client, [_SYSTEM_MESSAGE, {"role": "user", "content": query}])
+        for query in queries
+    ]
+    import asyncio
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    
+    results = []
+    total_tokens = 0
+    for query, outcome in zip(queries, outcomes):
+        # gather() may also hand back BaseExceptions such as CancelledError
+        if isinstance(outcome, BaseException):
+            logger.error("OpenAI API error for batch query: %s", outcome)
+            results.append({
+                "status": "error",
+                "query": query,
+                "message": f"OpenAI API error: {str(outcome)}"
+            })
+            continue
         
-    except Exception as e:
-        logger.error(f"Error in streaming response: {e}")
-        raise e
+        ai_response, usage_data, is_truncated = outcome
+        total_tokens += usage_data.get('total_tokens', 0)
+        results.append({
+            "status": "success",
+            "query": query,
+            "response": ai_response,
+            "is_truncated": is_truncated,
+            "finish_reason": "stop" if not is_truncated else "length",
+            "usage": usage_data
+        })
+    
+    logger.info("OpenAI batch of %s queries completed. Tokens used: %s", len(queries), total_tokens)
+    return create_response(200, {
+        "status": "success",
+        "model": "gpt-4o",
+        "results": results,
+        "timestamp": event.get('requestContext', {}).get('requestTimeEpoch')
+    })
 
-def handle_post_request(event: Dict[str, Any]) -> Dict[str, Any]:
+def _is_valid_query(query: Any) -> bool:
+    """
+    Check that a query is worth sending to OpenAI
+    """
+    return isinstance(query, str) and bool(query.strip())
+
+async def handle_post_request(event: Dict[str, Any]) -> Dict[str, Any]:
     """
     Handle POST requests - process travel-related queries with OpenAI GPT-4o
     """
     try:
-        body = json.loads(event.get('body', '{}'))
+        body = _parse_body(event)
+        
+        if not isinstance(body, dict):
+            return create_response(400, {
+                "status": "error",
+                "message": "Request body must be a JSON object"
+            })
+        
+        query = body.get('query')
+        queries = body.get('queries')
         
         # Validate required fields
-        if 'query' not in body:
+        if query is None and queries is None:
             return create_response(400, {
                 "status": "error",
                 "message": "Missing required field: query"
             })
         
-        query = body['query']
-        api_key = get_openai_api_key()
+        if query is not None and queries is not None:
+            return create_response(400, {
+                "status": "error",
+                "message": "Provide either query or queries, not both"
+            })
         
-        if not api_key:
-            return create_response(500, {
+        if query is not None and not _is_valid_query(query):
+            return create_response(400, {
                 "status": "error",
-                "message": "OpenAI API key not configured"
+                "message": "Field query must be a non-empty string"
             })
         
-        # Configure OpenAI client
-        openai.api_key = api_key
+        if queries is not None:
+            if not isinstance(queries, list) or not queries or not all(_is_valid_query(q) for q in queries):
+                return create_response(400, {
+                    "status": "error",
+                    "message": "Field queries must be a non-empty list of non-empty strings"
+                })
+            if len(queries) > MAX_BATCH_QUERIES:
+                return create_response(400, {
+                    "status": "error",
+                    "message": f"Too many queries: maximum is {MAX_BATCH_QUERIES}"
+                })
         
-        # Create travel-focused system prompt
-        system_prompt = """You are a knowledgeable travel assistant specializing in providing detailed, helpful, and accurate travel advice. 
+        client = _get_openai_client()
         
-        When responding to travel queries:
-        - Provide specific, actionable recommendations
-        - Include practical details like best times to visit, costs, and tips
-        - Suggest local experiences and hidden gems
-        - Consider safety and accessibility
-        - Be enthusiastic but realistic about expectations
-        - Format your response in a clear, easy-to-read structure
+        if not client:
+            return create_response(500, {
+                "status": "error",
+                "message": "OpenAI API key not configured"
+            })
         
-        Always be helpful, informative, and engaging in your travel advice."""
+        if queries is not None:
+            return await handle_batch_queries(client, queries, event)
         
         try:
-            # Make API call to OpenAI GPT-4o using the new API format
-            client = openai.OpenAI(api_key=api_key)
-            
             # Prepare messages for the API call
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": query}
-            ]
+            messages = [_SYSTEM_MESSAGE, {"role": "user", "content": query}]
             
             # Use streaming response handler to prevent truncation
-            ai_response, usage_data, is_truncated = handle_streaming_response(client, messages)
+            ai_response, usage_data, is_truncated = await handle_streaming_response(client, messages)
             
             # Prepare response data
             response_data = {
@@ -290,26 +544,26 @@ def handle_post_request(event: Dict[str, Any]) -> Dict[str, Any]:
             
             # Log truncation warning if response was cut off
             if is_truncated:
-                logger.warning(f"Response was truncated due to token limit. Tokens used: {usage_data.get('total_tokens', 0)}")
+                logger.warning("Response was truncated due to token limit. Tokens used: %s", usage_data.get('total_tokens', 0))
             
-            logger.info(f"OpenAI API call successful. Tokens used: {usage_data.get('total_tokens', 0)}")
+            logger.info("OpenAI API call successful. Tokens used: %s", usage_data.get('total_tokens', 0))
             return create_response(200, response_data)
             
         except Exception as e:
-            logger.error(f"OpenAI API error: {e}")
+            logger.error("OpenAI API error: %s", e)
             return create_response(500, {
                 "status": "error",
                 "message": f"OpenAI API error: {str(e)}",
                 "query": query
             })
         
-    except json.JSONDecodeError:
+    except (json.JSONDecodeError, binascii.Error):
         return create_response(400, {
             "status": "error",
             "message": "Invalid JSON in request body"
         })
     except Exception as e:
-        logger.error(f"Error processing POST request: {e}")
+        logger.error("Error processing POST request: %s", e)
         return create_response(500, {
             "status": "error",
             "message": "Internal server error"
@@ -320,7 +574,14 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     Main Lambda handler function
     """
     try:
-        logger.info(f"Received event: {json.dumps(event)}")
+        method = event.get('httpMethod') if event else None
+        
+        # Handle CORS preflight before any logging or validation work
+        if method == 'OPTIONS':
+            return handle_options_request()
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received event: %s", event)
         
         # Validate request
         is_valid, error_message = validate_request(event)
@@ -330,15 +591,11 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 "message": error_message
             })
         
-        # Handle CORS preflight
-        if event.get('httpMethod') == 'OPTIONS':
-            return handle_options_request()
-        
         # Route based on HTTP method
-        if event.get('httpMethod') == 'GET':
+        if method == 'GET':
             return handle_get_request(event)
-        elif event.get('httpMethod') == 'POST':
-            return handle_post_request(event)
+        elif method == 'POST':
+            return _get_event_loop().run_until_complete(handle_post_request(event))
         else:
             return create_response(405, {
                 "status": "error",
@@ -346,7 +603,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             })
             
     except Exception as e:
-        logger.error(f"Unexpected error in lambda_handler: {e}")
+        logger.error("Unexpected error in lambda_handler: %s", e)
         return create_response(500, {
             "status": "error",
             "message": "Internal server error"
@@ -0,0 +1,271 @@
+import asyncio
+import base64
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'functions'))
+
+import api_handler
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class _FakeSecretsManager:
+    def __init__(self, secrets):
+        self.secrets = secrets
+        self.calls = 0
+
+    def get_secret_value(self, SecretId):
+        self.calls += 1
+        return {'SecretString': api_handler._json_dumps(self.secrets[SecretId])}
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    monkeypatch.setattr(api_handler, '_secret_cache', {})
+    monkeypatch.setattr(api_handler, '_api_key_validations', {})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _FakeClock()
+    monkeypatch.setattr(api_handler, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def secrets(monkeypatch):
+    manager = _FakeSecretsManager({})
+    monkeypatch.setattr(api_handler, '_get_secrets_manager', lambda: manager)
+    return manager
+
+
+def test_cached_secret_hits_until_ttl_expires(clock, secrets):
+    secrets.secrets['name'] = {'api_key': 'sk-1'}
+    assert api_handler._cached_secret('name', ttl=300) == 'sk-1'
+    clock.now += 299
+    assert api_handler._cached_secret('name', ttl=300) == 'sk-1'
+    assert secrets.calls == 1
+
+    secrets.secrets['name'] = {'api_key': 'sk-2'}
+    clock.now += 1
+    assert api_handler._cached_secret('name', ttl=300) == 'sk-2'
+    assert secrets.calls == 2
+
+
+def test_cached_secret_does_not_cache_missing_key(clock, secrets):
+    secrets.secrets['name'] = {}
+    assert api_handler._cached_secret('name') is None
+    assert api_handler._cached_secret('name') is None
+    assert secrets.calls == 2
+    assert 'name' not in api_handler._secret_cache
+
+
+def test_env_int_falls_back_on_invalid_value(monkeypatch):
+    monkeypatch.setenv('SECRET_CACHE_TTL', '5m')
+    assert api_handler._env_int('SECRET_CACHE_TTL', 300) == 300
+    monkeypatch.setenv('SECRET_CACHE_TTL', '120')
+    assert api_handler._env_int('SECRET_CACHE_TTL', 300) == 120
+    monkeypatch.delenv('SECRET_CACHE_TTL')
+    assert api_handler._env_int('SECRET_CACHE_TTL', 300) == 300
+
+
+def _event_from(ip):
+    return {'requestContext': {'identity': {'sourceIp': ip}}}
+
+
+@pytest.fixture
+def whitelist(monkeypatch):
+    def configure(raw):
+        addresses, networks = api_handler._parse_ip_whitelist(raw)
+        monkeypatch.setattr(api_handler, '_WHITELISTED_IPS', addresses)
+        monkeypatch.setattr(api_handler, '_WHITELISTED_NETWORKS', networks)
+    return configure
+
+
+def test_empty_whitelist_allows_all(whitelist):
+    whitelist(' , ')
+    assert api_handler.validate_ip_whitelist(_event_from('8.8.8.8')) == (True, "")
+
+
+def test_invalid_whitelist_denies_all(whitelist):
+    whitelist('10.0.0.0/33')
+    assert api_handler.validate_ip_whitelist(_event_from('8.8.8.8')) == (False, "IP address not authorized")
+
+
+def test_exact_address_match(whitelist):
+    whitelist('192.168.1.100, 10.0.0.50')
+    assert api_handler.validate_ip_whitelist(_event_from('10.0.0.50')) == (True, "")
+    assert api_handler.validate_ip_whitelist(_event_from('10.0.0.51'))[0] is False
+
+
+def test_cidr_match(whitelist):
+    whitelist('203.0.113.0/24,2001:db8::/32')
+    assert api_handler.validate_ip_whitelist(_event_from('203.0.113.7')) == (True, "")
+    assert api_handler.validate_ip_whitelist(_event_from('2001:db8::1')) == (True, "")
+    assert api_handler.validate_ip_whitelist(_event_from('203.0.114.7'))[0] is False
+    assert api_handler.validate_ip_whitelist(_event_from(''))[0] is False
+
+
+def _post(body):
+    event = {'httpMethod': 'POST', 'body': api_handler._json_dumps(body)}
+    response = api_handler._get_event_loop().run_until_complete(api_handler.handle_post_request(event))
+    return response['statusCode'], api_handler._json_loads(response['body'])
+
+
+def test_post_rejects_null_query_fields():
+    status, body = _post({'queries': None})
+    assert status == 400
+    assert body['message'] == "Missing required field: query"
+
+
+@pytest.mark.parametrize('body', [[1, 2], "x", None])
+def test_post_rejects_non_object_body(body):
+    status, response = _post(body)
+    assert status == 400
+    assert response['message'] == "Request body must be a JSON object"
+
+
+@pytest.mark.parametrize('query', [5, "", "   ", {"city": "Paris"}])
+def test_post_rejects_invalid_query(query):
+    status, response = _post({'query': query})
+    assert status == 400
+    assert response['message'] == "Field query must be a non-empty string"
+
+
+@pytest.mark.parametrize('queries', [[], ["Paris?", ""], ["Paris?", 5], "Paris?"])
+def test_post_rejects_invalid_queries(queries):
+    status, response = _post({'queries': queries})
+    assert status == 400
+    assert response['message'] == "Field queries must be a non-empty list of non-empty strings"
+
+
+def test_post_rejects_query_and_queries_together():
+    status, body = _post({'query': 'Paris?', 'queries': ['Rome?']})
+    assert status == 400
+    assert body['message'] == "Provide either query or queries, not both"
+
+
+def test_batch_reports_cancelled_query_as_error(monkeypatch):
+    async def fake_streaming_response(client, messages):
+        if messages[-1]['content'] == 'cancelled':
+            raise asyncio.CancelledError()
+        return "answer", {"total_tokens": 3}, False
+
+    monkeypatch.setattr(api_handler, 'handle_streaming_response', fake_streaming_response)
+    response = api_handler._get_event_loop().run_until_complete(
+        api_handler.handle_batch_queries(None, ['ok', 'cancelled'], {})
+    )
+    results = api_handler._json_loads(response['body'])['results']
+    assert [result['status'] for result in results] == ['success', 'error']
+
+
+@pytest.fixture
+def stored_api_key(monkeypatch):
+    calls = []
+
+    def fake_cached_secret(secret_name, ttl=None):
+        calls.append(secret_name)
+        return 'client-key'
+
+    monkeypatch.setattr(api_handler, '_cached_secret', fake_cached_secret)
+    return calls
+
+
+def _event_with_key(key):
+    return {'headers': {'x-api-key': key}}
+
+
+def test_validated_key_skips_secret_lookup(clock, stored_api_key):
+    assert api_handler.validate_api_key(_event_with_key('client-key')) == (True, "")
+    assert api_handler.validate_api_key(_event_with_key('client-key')) == (True, "")
+    assert len(stored_api_key) == 1
+
+
+def test_validated_key_expires_after_ttl(clock, stored_api_key):
+    assert api_handler.validate_api_key(_event_with_key('client-key')) == (True, "")
+    clock.now += api_handler.API_KEY_VALIDATION_TTL
+    assert api_handler.validate_api_key(_event_with_key('client-key')) == (True, "")
+    assert len(stored_api_key) == 2
+
+
+def test_invalid_key_is_not_cached(clock, stored_api_key):
+    assert api_handler.validate_api_key(_event_with_key('wrong-key')) == (False, "Invalid API key")
+    assert api_handler._api_key_validations == {}
+    assert api_handler.validate_api_key(_event_with_key('wrong-key')) == (False, "Invalid API key")
+    assert len(stored_api_key) == 2
+
+
+def _chunk(content=None, finish_reason=None, usage=None):
+    choices = [] if content is None and finish_reason is None else [
+        SimpleNamespace(delta=SimpleNamespace(content=content), finish_reason=finish_reason)
+    ]
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+def _fake_client(chunks):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def create(**kwargs):
+        return stream()
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def _stream(chunks):
+    return api_handler._get_event_loop().run_until_complete(
+        api_handler.handle_streaming_response(_fake_client(chunks), [])
+    )
+
+
+def test_streaming_response_collects_text_usage_and_truncation():
+    usage = SimpleNamespace(prompt_tokens=5, completion_tokens=3, total_tokens=8)
+    text, usage_data, is_truncated = _stream([
+        _chunk("Hello"),
+        _chunk(", "),
+        _chunk("Paris", finish_reason="length"),
+        _chunk(usage=usage),
+    ])
+    assert text == "Hello, Paris"
+    assert usage_data == {"prompt_tokens": 5, "completion_tokens": 3, "total_tokens": 8}
+    assert is_truncated is True
+
+
+def test_streaming_response_without_usage_chunk():
+    text, usage_data, is_truncated = _stream([_chunk("Hi"), _chunk(finish_reason="stop")])
+    assert text == "Hi"
+    assert usage_data == {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    assert is_truncated is False
+
+
+def test_parse_body_decodes_base64():
+    event = {'body': base64.b64encode(b'{"query": "Paris?"}').decode(), 'isBase64Encoded': True}
+    assert api_handler._parse_body(event) == {'query': 'Paris?'}
+
+
+@pytest.mark.parametrize('raw', [None, ""])
+def test_parse_body_empty(raw):
+    assert api_handler._parse_body({'body': raw}) == {}
+
+
+def test_post_rejects_malformed_base64():
+    event = {'httpMethod': 'POST', 'body': 'not*base64', 'isBase64Encoded': True}
+    response = api_handler._get_event_loop().run_until_complete(api_handler.handle_post_request(event))
+    assert response['statusCode'] == 400
+    assert api_handler._json_loads(response['body'])['message'] == "Invalid JSON in request body"
+
+
+def test_api_key_header_lookup_is_case_insensitive(clock, stored_api_key):
+    assert api_handler.validate_api_key({'headers': {'X-Api-Key': 'client-key'}}) == (True, "")
+    assert api_handler.validate_api_key({'headers': None}) == (False, "API key is required")